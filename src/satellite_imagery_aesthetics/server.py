@@ -1,199 +1,321 @@
 import yaml
 import json
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from fastmcp import FastMCP
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+
+def _dumps(obj, indent: bool = False) -> str:
+    """Serialize a tool response, using orjson when it is installed.
+
+    The stdlib fallback is configured to match orjson byte for byte (compact
+    separators, raw UTF-8), so output does not depend on the speedups extra.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
 mcp = FastMCP("satellite-imagery-aesthetics")
 
+# Prefer the libyaml-backed loader; PyYAML falls back to pure Python without it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Load YAML olog on startup
 yaml_path = Path(__file__).parent / "ologs" / "imagery_profiles.yaml"
 with open(yaml_path) as f:
-    olog = yaml.safe_load(f)
+    olog = yaml.load(f, Loader=_YamlLoader)
+
+
+def _freeze(options: Mapping) -> MappingProxyType:
+    """Wrap a taxonomy in a read-only view keyed by interned strings.
+
+    The freeze is shallow: the per-option dicts stay mutable but must be
+    treated as read-only, since responses are pre-encoded from them below.
+    """
+    return MappingProxyType({sys.intern(k): v for k, v in options.items()})
+
+
+imagery_profiles = _freeze(olog["imagery_profiles"])
+altitude_perspectives = _freeze(olog["altitude_perspectives"])
+feature_emphasis = _freeze(olog["feature_emphasis"])
+aesthetic_strength = _freeze(olog["aesthetic_strength"])
+
+
+def _build_lookup(options: Mapping) -> dict:
+    """Map common spellings of each option key straight to the key itself.
+
+    Every variant normalizes (lowercase, spaces to underscores) back to its
+    key, so a hit here is equivalent to normalizing the input first.
+    """
+    lookup = {}
+    for key in options:
+        spaced = key.replace("_", " ")
+        for variant in (key, key.upper(), spaced, spaced.upper(), spaced.title()):
+            lookup[variant] = key
+    return lookup
+
+
+def _resolve(lookup: dict, value: str):
+    """Return the option key for value, or None if it is not a known option."""
+    key = lookup.get(value)
+    if key is None:
+        key = lookup.get(value.lower().replace(" ", "_"))
+    return key
+
+
+_IMAGERY_LOOKUP = _build_lookup(imagery_profiles)
+_ALTITUDE_LOOKUP = _build_lookup(altitude_perspectives)
+_FEATURE_LOOKUP = _build_lookup(feature_emphasis)
+_STRENGTH_LOOKUP = _build_lookup(aesthetic_strength)
+
+# Characteristic dimensions in the order they are woven in by strength
+_CHARACTERISTIC_DIMENSIONS = (
+    "structure", "material", "color", "texture",
+    "composition", "style", "quality", "mood"
+)
+_all_chars = {
+    key: tuple((dim, profile[dim]) for dim in _CHARACTERISTIC_DIMENSIONS)
+    for key, profile in imagery_profiles.items()
+}
+_all_chars_dict = {key: dict(chars) for key, chars in _all_chars.items()}
+
+# get_enhancement_guidance layout; the visual-elements block depends only on
+# the imagery type, so it is rendered once per profile.
+_GUIDANCE_TMPL = """SATELLITE IMAGERY ENHANCEMENT GUIDANCE
+
+Imagery Type: {profile_name}
+Altitude Perspective: {altitude}
+Feature Emphasis: {feature}
+Aesthetic Strength: {strength}
+
+{profile_block}
+
+Remember:
+1. Preserve the user's core concept completely
+2. Use vivid, artistic language
+3. Emphasize HOW it looks (colors, patterns, perspective), not WHAT it is
+4. End with "highly detailed, 8k, satellite imagery aesthetic"
+5. Never add subjects the user didn't request"""
+
+_guidance_profile_block = {
+    key: (
+        f"Key Visual Elements:\n"
+        f"- Colors: {profile['color']}\n"
+        f"- Textures: {profile['texture']}\n"
+        f"- Mood: {profile['mood']}\n"
+        f"\n"
+        f"Examples to draw from: {profile['examples']}"
+    )
+    for key, profile in imagery_profiles.items()
+}
+_EMPTY = {}
+
+# The olog is read-only after load, so the list_* responses never change.
+# Serialize them once here instead of on every tool call (the JSON encoders
+# only accept real dicts, hence the dict() copies).
+_LIST_IMAGERY_TYPES_JSON = _dumps({
+    "imagery_types": list(imagery_profiles),
+    "count": len(imagery_profiles)
+})
+_LIST_ALTITUDE_PERSPECTIVES_JSON = _dumps({
+    "perspectives": list(altitude_perspectives),
+    "details": dict(altitude_perspectives)
+})
+_LIST_FEATURE_EMPHASIS_JSON = _dumps({
+    "options": list(feature_emphasis),
+    "details": dict(feature_emphasis)
+})
+_LIST_AESTHETIC_STRENGTHS_JSON = _dumps({
+    "strengths": list(aesthetic_strength),
+    "details": dict(aesthetic_strength)
+})
+
 
-imagery_profiles = olog["imagery_profiles"]
-altitude_perspectives = olog["altitude_perspectives"]
-feature_emphasis = olog["feature_emphasis"]
-aesthetic_strength = olog["aesthetic_strength"]
+def _json_members(members: dict) -> str:
+    """Encode members as the indented body of a top-level JSON object.
+
+    The result is the text between the outer braces, so fragments encoded
+    separately can be joined by _json_response into one indented document.
+    """
+    if not members:
+        # "{}" has no body to slice out and would leave a dangling comma
+        raise ValueError("_json_members needs at least one member")
+    return _dumps(members, indent=True)[2:-2]
+
+
+def _json_response(*fragments: str) -> str:
+    """Join _json_members fragments into a complete indented JSON object."""
+    return "{\n" + ",\n".join(fragments) + "\n}"
+
+
+_PROFILE_RESPONSE_JSON = {
+    key: _dumps({"imagery_type": key, "profile": profile})
+    for key, profile in imagery_profiles.items()
+}
+
+# map_satellite_parameters output, pre-encoded per option. Only the
+# selected_characteristics member depends on two inputs at once.
+_OUTPUT_FORMAT = "60-80 words, natural sentence flow, vivid artistic language, ending with 'highly detailed, 8k, satellite imagery aesthetic'"
+_map_head_json = {
+    key: _json_members({"imagery_type": key, "profile_name": profile["name"]})
+    for key, profile in imagery_profiles.items()
+}
+_map_altitude_json = {
+    key: _json_members({"altitude_perspective": {
+        "type": key,
+        "description": data["description"],
+        "scale": data["scale"],
+        "context": data["context"]
+    }})
+    for key, data in altitude_perspectives.items()
+}
+_map_feature_json = {
+    key: _json_members({"feature_emphasis": {
+        "type": key,
+        "focus": data["focus"]
+    }})
+    for key, data in feature_emphasis.items()
+}
+_map_strength_json = {
+    key: _json_members({"aesthetic_strength": {
+        "type": key,
+        "approach": data["approach"],
+        "characteristic_count": data["characteristics"]
+    }})
+    for key, data in aesthetic_strength.items()
+}
+_map_tail_json = {
+    key: _json_members({
+        "all_available_characteristics": _all_chars_dict[key],
+        "examples": profile["examples"],
+        "output_format": _OUTPUT_FORMAT
+    })
+    for key, profile in imagery_profiles.items()
+}
 
 
 @mcp.tool()
 def list_imagery_types() -> str:
     """List all available satellite imagery types."""
-    types = list(imagery_profiles.keys())
-    return json.dumps({
-        "imagery_types": types,
-        "count": len(types)
-    })
+    return _LIST_IMAGERY_TYPES_JSON
 
 
 @mcp.tool()
 def get_imagery_profile(imagery_type: str) -> str:
     """Layer 1: Retrieve complete profile data for an imagery type."""
-    imagery_type_normalized = imagery_type.lower().replace(" ", "_")
+    imagery_type_normalized = _resolve(_IMAGERY_LOOKUP, imagery_type)
     
-    if imagery_type_normalized not in imagery_profiles:
-        return json.dumps({
+    if imagery_type_normalized is None:
+        return _dumps({
             "error": f"Unknown imagery type: {imagery_type}",
             "available": list(imagery_profiles.keys())
         })
     
-    profile = imagery_profiles[imagery_type_normalized]
-    return json.dumps({
-        "imagery_type": imagery_type_normalized,
-        "profile": profile
-    })
+    return _PROFILE_RESPONSE_JSON[imagery_type_normalized]
 
 
 @mcp.tool()
 def list_altitude_perspectives() -> str:
     """List all available altitude perspectives for composition."""
-    perspectives = list(altitude_perspectives.keys())
-    details = {k: v for k, v in altitude_perspectives.items()}
-    return json.dumps({
-        "perspectives": perspectives,
-        "details": details
-    })
+    return _LIST_ALTITUDE_PERSPECTIVES_JSON
 
 
 @mcp.tool()
 def list_feature_emphasis_options() -> str:
     """List all available feature emphasis types."""
-    options = list(feature_emphasis.keys())
-    details = {k: v for k, v in feature_emphasis.items()}
-    return json.dumps({
-        "options": options,
-        "details": details
-    })
+    return _LIST_FEATURE_EMPHASIS_JSON
 
 
 @mcp.tool()
 def list_aesthetic_strengths() -> str:
     """List all available aesthetic strength levels."""
-    strengths = list(aesthetic_strength.keys())
-    details = {k: v for k, v in aesthetic_strength.items()}
-    return json.dumps({
-        "strengths": strengths,
-        "details": details
-    })
+    return _LIST_AESTHETIC_STRENGTHS_JSON
 
 
 @mcp.tool()
 def map_satellite_parameters(imagery_type: str, altitude: str, 
                            feature_emphasis_type: str, strength: str) -> str:
     """Layer 2: Deterministic mapping of parameters (zero LLM cost)."""
-    imagery_type_normalized = imagery_type.lower().replace(" ", "_")
-    altitude_normalized = altitude.lower().replace(" ", "_")
-    feature_normalized = feature_emphasis_type.lower().replace(" ", "_")
-    strength_normalized = strength.lower().replace(" ", "_")
-    
-    # Validate all inputs
-    errors = []
-    if imagery_type_normalized not in imagery_profiles:
-        errors.append(f"Unknown imagery type: {imagery_type}")
-    if altitude_normalized not in altitude_perspectives:
-        errors.append(f"Unknown altitude: {altitude}")
-    if feature_normalized not in feature_emphasis:
-        errors.append(f"Unknown feature emphasis: {feature_emphasis_type}")
-    if strength_normalized not in aesthetic_strength:
-        errors.append(f"Unknown aesthetic strength: {strength}")
-    
-    if errors:
-        return json.dumps({"errors": errors})
+    # Validate inputs in order, stopping at the first unknown value
+    imagery_type_normalized = _resolve(_IMAGERY_LOOKUP, imagery_type)
+    if imagery_type_normalized is None:
+        return _dumps({"errors": [f"Unknown imagery type: {imagery_type}"]})
+    altitude_normalized = _resolve(_ALTITUDE_LOOKUP, altitude)
+    if altitude_normalized is None:
+        return _dumps({"errors": [f"Unknown altitude: {altitude}"]})
+    feature_normalized = _resolve(_FEATURE_LOOKUP, feature_emphasis_type)
+    if feature_normalized is None:
+        return _dumps({"errors": [f"Unknown feature emphasis: {feature_emphasis_type}"]})
+    strength_normalized = _resolve(_STRENGTH_LOOKUP, strength)
+    if strength_normalized is None:
+        return _dumps({"errors": [f"Unknown aesthetic strength: {strength}"]})
     
-    # Build semantic bridge
-    profile = imagery_profiles[imagery_type_normalized]
-    altitude_data = altitude_perspectives[altitude_normalized]
-    feature_data = feature_emphasis[feature_normalized]
-    strength_data = aesthetic_strength[strength_normalized]
-    
-    # Determine which characteristics to weave in
-    characteristic_count = strength_data["characteristics"]
-    all_characteristics = [
-        ("structure", profile["structure"]),
-        ("material", profile["material"]),
-        ("color", profile["color"]),
-        ("texture", profile["texture"]),
-        ("composition", profile["composition"]),
-        ("style", profile["style"]),
-        ("quality", profile["quality"]),
-        ("mood", profile["mood"])
-    ]
+    return _mapped_parameters_json(imagery_type_normalized, altitude_normalized,
+                                   feature_normalized, strength_normalized)
+
+
+# Keyed on resolved option keys only, so the cache holds at most one entry
+# per valid combination and never stores client-supplied strings.
+@lru_cache(maxsize=None)
+def _mapped_parameters_json(imagery_type_normalized: str, altitude_normalized: str,
+                            feature_normalized: str, strength_normalized: str) -> str:
+    # Build semantic bridge from the pre-encoded fragments
+    characteristic_count = aesthetic_strength[strength_normalized]["characteristics"]
+    all_characteristics = _all_chars[imagery_type_normalized]
     
     # Select top N characteristics based on strength
-    selected_characteristics = all_characteristics[:characteristic_count]
-    
-    mapped_parameters = {
-        "imagery_type": imagery_type_normalized,
-        "profile_name": profile["name"],
-        "altitude_perspective": {
-            "type": altitude_normalized,
-            "description": altitude_data["description"],
-            "scale": altitude_data["scale"],
-            "context": altitude_data["context"]
-        },
-        "feature_emphasis": {
-            "type": feature_normalized,
-            "focus": feature_data["focus"]
-        },
-        "aesthetic_strength": {
-            "type": strength_normalized,
-            "approach": strength_data["approach"],
-            "characteristic_count": characteristic_count
-        },
-        "selected_characteristics": {
-            name: value for name, value in selected_characteristics
-        },
-        "all_available_characteristics": {
-            name: value for name, value in all_characteristics
-        },
-        "examples": profile["examples"],
-        "output_format": "60-80 words, natural sentence flow, vivid artistic language, ending with 'highly detailed, 8k, satellite imagery aesthetic'"
-    }
+    selected_characteristics = dict(all_characteristics[:characteristic_count])
     
-    return json.dumps(mapped_parameters, indent=2)
+    return _json_response(
+        _map_head_json[imagery_type_normalized],
+        _map_altitude_json[altitude_normalized],
+        _map_feature_json[feature_normalized],
+        _map_strength_json[strength_normalized],
+        _json_members({"selected_characteristics": selected_characteristics}),
+        _map_tail_json[imagery_type_normalized]
+    )
 
 
 @mcp.tool()
 def get_enhancement_guidance(imagery_type: str, altitude: str,
                             feature_emphasis_type: str, strength: str) -> str:
     """Get human-readable guidance for enhancement parameters."""
-    imagery_type_normalized = imagery_type.lower().replace(" ", "_")
-    altitude_normalized = altitude.lower().replace(" ", "_")
-    feature_normalized = feature_emphasis_type.lower().replace(" ", "_")
-    strength_normalized = strength.lower().replace(" ", "_")
-    
-    if imagery_type_normalized not in imagery_profiles:
-        return json.dumps({"error": f"Unknown imagery type: {imagery_type}"})
+    imagery_type_normalized = _resolve(_IMAGERY_LOOKUP, imagery_type)
     
-    profile = imagery_profiles[imagery_type_normalized]
-    altitude_data = altitude_perspectives.get(altitude_normalized)
-    feature_data = feature_emphasis.get(feature_normalized)
-    strength_data = aesthetic_strength.get(strength_normalized)
+    if imagery_type_normalized is None:
+        return _dumps({"error": f"Unknown imagery type: {imagery_type}"})
     
-    guidance = f"""
-SATELLITE IMAGERY ENHANCEMENT GUIDANCE
-
-Imagery Type: {profile['name']}
-Altitude Perspective: {altitude_data.get('description', 'Unknown') if altitude_data else 'Unknown'}
-Feature Emphasis: {feature_data.get('focus', 'Unknown') if feature_data else 'Unknown'}
-Aesthetic Strength: {strength_data.get('approach', 'Unknown') if strength_data else 'Unknown'}
-
-Key Visual Elements:
-- Colors: {profile['color']}
-- Textures: {profile['texture']}
-- Mood: {profile['mood']}
+    return _guidance_text(
+        imagery_type_normalized,
+        _resolve(_ALTITUDE_LOOKUP, altitude),
+        _resolve(_FEATURE_LOOKUP, feature_emphasis_type),
+        _resolve(_STRENGTH_LOOKUP, strength)
+    )
 
-Examples to draw from: {profile['examples']}
 
-Remember:
-1. Preserve the user's core concept completely
-2. Use vivid, artistic language
-3. Emphasize HOW it looks (colors, patterns, perspective), not WHAT it is
-4. End with "highly detailed, 8k, satellite imagery aesthetic"
-5. Never add subjects the user didn't request
-"""
-    
-    return guidance.strip()
+# Unknown altitude/feature/strength resolve to None, which keeps this
+# bounded to (options + 1) per dimension.
+@lru_cache(maxsize=None)
+def _guidance_text(imagery_type_normalized: str, altitude_normalized,
+                   feature_normalized, strength_normalized) -> str:
+    return _GUIDANCE_TMPL.format_map({
+        "profile_name": imagery_profiles[imagery_type_normalized]["name"],
+        "altitude": altitude_perspectives.get(altitude_normalized, _EMPTY).get("description", "Unknown"),
+        "feature": feature_emphasis.get(feature_normalized, _EMPTY).get("focus", "Unknown"),
+        "strength": aesthetic_strength.get(strength_normalized, _EMPTY).get("approach", "Unknown"),
+        "profile_block": _guidance_profile_block[imagery_type_normalized]
+    })
 
 
 if __name__ == "__main__":
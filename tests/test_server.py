@@ -8,11 +8,18 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import yaml
+from satellite_imagery_aesthetics import server
 from satellite_imagery_aesthetics.server import (
-    imagery_profiles, altitude_perspectives, feature_emphasis, aesthetic_strength
+    imagery_profiles, altitude_perspectives, feature_emphasis, aesthetic_strength,
+    get_imagery_profile, map_satellite_parameters, get_enhancement_guidance
 )
 
 
+def call_tool(tool, *args):
+    """Call an MCP tool, unwrapping FastMCP versions that return Tool objects."""
+    return getattr(tool, "fn", tool)(*args)
+
+
 class TestImageryProfiles:
     """Test imagery profile taxonomy."""
     
@@ -141,6 +148,199 @@ class TestCombinations:
             assert strength in aesthetic_strength
 
 
+class TestToolLookup:
+    """Test tool arguments resolve through the normalized-key lookups."""
+    
+    IMAGERY_VARIANTS = ["true_color_rgb", "TRUE COLOR RGB", "True Color Rgb", "TRUE_COLOR_RGB", "true color RGB"]
+    
+    def test_imagery_profile_variants(self):
+        """Verify case and spacing variants resolve to the same profile."""
+        responses = [json.loads(call_tool(get_imagery_profile, v)) for v in self.IMAGERY_VARIANTS]
+        for response in responses:
+            assert response == {
+                "imagery_type": "true_color_rgb",
+                "profile": imagery_profiles["true_color_rgb"]
+            }
+    
+    def test_imagery_profile_unknown(self):
+        """Verify unknown imagery types return the error payload."""
+        response = json.loads(call_tool(get_imagery_profile, "bogus"))
+        assert response == {
+            "error": "Unknown imagery type: bogus",
+            "available": list(imagery_profiles)
+        }
+    
+    def test_map_parameters_variants(self):
+        """Verify every argument of map_satellite_parameters is normalized."""
+        expected = json.loads(call_tool(
+            map_satellite_parameters, "true_color_rgb", "high_altitude", "urban", "strong"
+        ))
+        for imagery in self.IMAGERY_VARIANTS:
+            for altitude in ["High Altitude", "HIGH_ALTITUDE", "high altitude"]:
+                response = call_tool(map_satellite_parameters, imagery, altitude, "URBAN", "Strong")
+                assert json.loads(response) == expected
+    
+    def test_guidance_variants(self):
+        """Verify guidance renders the same text for every input spelling."""
+        expected = call_tool(
+            get_enhancement_guidance, "true_color_rgb", "orbital", "natural", "subtle"
+        )
+        profile = imagery_profiles["true_color_rgb"]
+        assert expected.startswith("SATELLITE IMAGERY ENHANCEMENT GUIDANCE\n")
+        assert f"Imagery Type: {profile['name']}\n" in expected
+        assert f"Altitude Perspective: {altitude_perspectives['orbital']['description']}\n" in expected
+        assert f"Feature Emphasis: {feature_emphasis['natural']['focus']}\n" in expected
+        assert f"Aesthetic Strength: {aesthetic_strength['subtle']['approach']}\n" in expected
+        assert f"- Colors: {profile['color']}\n" in expected
+        assert f"Examples to draw from: {profile['examples']}\n" in expected
+        assert expected.endswith("5. Never add subjects the user didn't request")
+        for imagery in self.IMAGERY_VARIANTS:
+            response = call_tool(get_enhancement_guidance, imagery, "ORBITAL", "Natural", "SUBTLE")
+            assert response == expected
+    
+    def test_guidance_unknown(self):
+        """Verify guidance errors on imagery type and falls back to Unknown otherwise."""
+        response = json.loads(call_tool(get_enhancement_guidance, "bogus", "orbital", "natural", "subtle"))
+        assert response == {"error": "Unknown imagery type: bogus"}
+        
+        guidance = call_tool(get_enhancement_guidance, "true_color_rgb", "nope", "x", "y")
+        assert "Altitude Perspective: Unknown\n" in guidance
+        assert "Feature Emphasis: Unknown\n" in guidance
+        assert "Aesthetic Strength: Unknown\n" in guidance
+
+
+class TestMapParameters:
+    """Test map_satellite_parameters responses."""
+    
+    def test_reports_first_error_only(self):
+        """Verify validation stops at the first unknown argument, in order."""
+        cases = [
+            (("bogus", "nope", "x", "y"), "Unknown imagery type: bogus"),
+            (("true_color_rgb", "nope", "x", "y"), "Unknown altitude: nope"),
+            (("true_color_rgb", "orbital", "x", "y"), "Unknown feature emphasis: x"),
+            (("true_color_rgb", "orbital", "natural", "y"), "Unknown aesthetic strength: y"),
+        ]
+        for args, message in cases:
+            response = json.loads(call_tool(map_satellite_parameters, *args))
+            assert response == {"errors": [message]}
+    
+    def _expected(self, imagery, altitude, feature, strength):
+        """Build the expected response directly from the taxonomies."""
+        profile = imagery_profiles[imagery]
+        altitude_data = altitude_perspectives[altitude]
+        strength_data = aesthetic_strength[strength]
+        dimensions = ["structure", "material", "color", "texture",
+                      "composition", "style", "quality", "mood"]
+        all_characteristics = {d: profile[d] for d in dimensions}
+        return {
+            "imagery_type": imagery,
+            "profile_name": profile["name"],
+            "altitude_perspective": {
+                "type": altitude,
+                "description": altitude_data["description"],
+                "scale": altitude_data["scale"],
+                "context": altitude_data["context"]
+            },
+            "feature_emphasis": {
+                "type": feature,
+                "focus": feature_emphasis[feature]["focus"]
+            },
+            "aesthetic_strength": {
+                "type": strength,
+                "approach": strength_data["approach"],
+                "characteristic_count": strength_data["characteristics"]
+            },
+            "selected_characteristics": {
+                d: profile[d] for d in dimensions[:strength_data["characteristics"]]
+            },
+            "all_available_characteristics": all_characteristics,
+            "examples": profile["examples"],
+            "output_format": "60-80 words, natural sentence flow, vivid artistic language, ending with 'highly detailed, 8k, satellite imagery aesthetic'"
+        }
+    
+    def test_response_per_strength(self):
+        """Verify the assembled response parses to the expected mapping."""
+        test_cases = [
+            ("false_color_infrared", "orbital", "natural", "subtle"),
+            ("synthetic_aperture_radar", "low_altitude", "urban", "balanced"),
+            ("multispectral_agriculture", "medium_altitude", "abstract", "strong"),
+        ]
+        for args in test_cases:
+            response = call_tool(map_satellite_parameters, *args)
+            assert json.loads(response) == self._expected(*args)
+    
+    def test_response_is_indented_document(self):
+        """Verify the spliced fragments match a single indented dump."""
+        for imagery in imagery_profiles:
+            for strength in aesthetic_strength:
+                args = (imagery, "high_altitude", "mixed", strength)
+                response = call_tool(map_satellite_parameters, *args)
+                assert response == server._dumps(self._expected(*args), indent=True)
+    
+    def test_cache_holds_only_valid_combinations(self):
+        """Verify invalid or oddly spelled arguments never add cache entries."""
+        call_tool(map_satellite_parameters, "true_color_rgb", "orbital", "natural", "subtle")
+        before = server._mapped_parameters_json.cache_info().currsize
+        for i in range(50):
+            call_tool(map_satellite_parameters, f"junk-{i}" * 100, "orbital", "natural", "subtle")
+            call_tool(map_satellite_parameters, "True Color RGB", "ORBITAL", "Natural", f"junk-{i}")
+            call_tool(get_enhancement_guidance, f"junk-{i}", "orbital", "natural", "subtle")
+        call_tool(map_satellite_parameters, "TRUE COLOR RGB", "Orbital", "NATURAL", "Subtle")
+        assert server._mapped_parameters_json.cache_info().currsize == before
+        assert server._guidance_text.cache_info().currsize <= (
+            len(imagery_profiles) * (len(altitude_perspectives) + 1) *
+            (len(feature_emphasis) + 1) * (len(aesthetic_strength) + 1)
+        )
+    
+    def test_json_members_rejects_empty(self):
+        """Verify an empty fragment is refused rather than emitting invalid JSON."""
+        try:
+            server._json_members({})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("_json_members({}) did not raise ValueError")
+
+
+class TestJsonEncoding:
+    """Test response serialization is independent of the optional orjson."""
+    
+    SAMPLES = [
+        {"error": "Ünknown imagery type: \"bogus\"", "available": ["a", "b"]},
+        {"nested": {"empty": {}, "list": [], "count": 2, "flag": True, "none": None}},
+    ]
+    
+    def _stdlib_dumps(self, obj, indent):
+        """Serialize with orjson disabled, forcing the stdlib fallback."""
+        saved = server.orjson
+        server.orjson = None
+        try:
+            return server._dumps(obj, indent=indent)
+        finally:
+            server.orjson = saved
+    
+    def test_compact_format(self):
+        """Verify non-indented output uses compact separators and raw UTF-8."""
+        for obj in self.SAMPLES:
+            expected = json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+            assert server._dumps(obj) == expected
+            assert self._stdlib_dumps(obj, False) == expected
+    
+    def test_indented_format(self):
+        """Verify indented output matches json.dumps(indent=2)."""
+        for obj in self.SAMPLES:
+            expected = json.dumps(obj, indent=2, ensure_ascii=False)
+            assert server._dumps(obj, indent=True) == expected
+            assert self._stdlib_dumps(obj, True) == expected
+    
+    def test_round_trip(self):
+        """Verify both encoders round-trip to the original objects."""
+        for obj in self.SAMPLES:
+            for indent in (False, True):
+                assert json.loads(server._dumps(obj, indent=indent)) == obj
+                assert json.loads(self._stdlib_dumps(obj, indent)) == obj
+
+
 def run_tests():
     """Run all tests and report results."""
     test_classes = [
@@ -149,6 +349,9 @@ def run_tests():
         TestFeatureEmphasis,
         TestAestheticStrength,
         TestCombinations,
+        TestToolLookup,
+        TestMapParameters,
+        TestJsonEncoding,
     ]
     
     total_tests = 0